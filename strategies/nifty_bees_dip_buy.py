@@ -3,7 +3,10 @@ import yfinance as yf
 import pandas as pd
 import altair as alt
 from upcoming_strategies.helpers import plot_portfolio_value_chart
-from upcoming_strategies.helpers import calculate_xirr_from_data
+from upcoming_strategies.helpers import calculate_xirr_from_result
+from upcoming_strategies.kernel import Strategy, backtest, prepare_prices, dip_below, fixed_amount, summarize
+from upcoming_strategies.export import build_fills_frame, build_equity_frame, build_metrics_frame
+from upcoming_strategies.export import render_export_buttons, params_key
 
 def run():
     st.header("📈 NiftyBees Dip-Buy Strategy")
@@ -18,41 +21,20 @@ def run():
     end_date = st.sidebar.date_input("End Date", pd.Timestamp.today())
     investment_per_trade = st.sidebar.number_input("Investment per trade (₹)", 5000, step=500)
 
-    data = yf.download(ticker, start=start_date, end=end_date)
-    data["Change %"] = (data["Close"] - data["Close"].shift(1)) / data["Close"].shift(1) * 100
-    buy_days = data[data["Change %"] <= -0.5].copy()
-    buy_days["Units Bought"] = investment_per_trade / buy_days["Close"]
-    buy_days["Investment"] = investment_per_trade
+    prices = prepare_prices(yf.download(ticker, start=start_date, end=end_date))
+    result = backtest(prices, [Strategy("dip_buy", dip_below(0.5), fixed_amount(investment_per_trade))])
+    data = prices.set_index("Date")
+    buy_days = result.fills.set_index("Date")
 
-    total_investment = buy_days["Investment"].sum()
-    total_units = buy_days["Units Bought"].sum()
-    current_price = float(data["Close"].iloc[-1])
-    current_value = total_units * current_price
-    profit = current_value - total_investment
-    return_pct = (profit / total_investment) * 100
+    metrics = summarize(result)
+    total_investment = metrics["Total Invested"]
+    current_value = metrics["Current Value"]
+    profit = metrics["Profit"]
+    return_pct = metrics["Return %"]
 
-    # --- Prepare transactions for XIRR ---
-    transactions = []
-
-    # Outflows (money invested)
-    for idx, row in buy_days.iterrows():
-        transactions.append({
-            "Date": pd.to_datetime(idx),
-            "CashFlow": -float(row["Investment"])
-        })
-
-    # Add final portfolio value as inflow (today's date)
-    transactions.append({
-        "Date": pd.to_datetime(data.index[-1]),
-        "CashFlow": float(current_value)
-    })
-
-    transactions_df = pd.DataFrame(transactions)
-
-    # st.write("🧾 Debug: Transaction Cashflows for XIRR", transactions_df)
-
-    # --- Calculate XIRR ---
-    xirr_value = calculate_xirr_from_data(transactions_df)
+    # --- Calculate XIRR (cash flows end at the last price date) ---
+    xirr_value = calculate_xirr_from_result(result)
+    metrics["XIRR %"] = xirr_value
 
     # --- Summary Metrics in a single row ---
     col1, col2, col3, col4,col5 = st.columns(5)
@@ -68,7 +50,7 @@ def run():
     with col4:
         st.metric("📈 Return %", f"{return_pct:.2f}%")
     with col5:
-        st.metric("📈 XIRR %", f"{xirr_value:.2f}%")
+        st.metric("📈 XIRR %", f"{xirr_value:.2f}%" if xirr_value is not None else "N/A")
     # st.metric("Total Investment", f"₹{total_investment:,.0f}")
     # st.metric("Current Value", f"₹{current_value:,.0f}")
     # st.metric("Profit / Loss", f"₹{profit:,.0f}")
@@ -98,3 +80,11 @@ def run():
     st.caption("🔵 NiftyBees closing price | 🔴 Red dots = Buy days")
     st.subheader("Transaction Log")
     st.dataframe(buy_days[["Close", "Change %", "Units Bought", "Investment"]])
+
+    # --- Export ---
+    params = {"dip %": 0.5, "investment_per_trade": investment_per_trade}
+    run_id = f"nifty_bees_dip_buy:{ticker}:{params_key(params)}"
+    fills_df = build_fills_frame(buy_days, run_id, ticker)
+    equity_df = build_equity_frame(result.equity, run_id, ticker)
+    metrics_df = build_metrics_frame(run_id, ticker, params=params, **metrics)
+    render_export_buttons(fills_df, equity_df, metrics_df, key="nifty_bees_dip_buy")
@@ -4,7 +4,72 @@ import pandas as pd
 import altair as alt
 from upcoming_strategies.helpers import plot_portfolio_value_chart, calculate_xirr_from_data
 from upcoming_strategies.helpers import plot_adaptive_portfolio_chart
-from upcoming_strategies.helpers import calculate_xirr_from_data_v2
+from upcoming_strategies.helpers import calculate_xirr_from_result
+from upcoming_strategies.kernel import Strategy, backtest, prepare_prices, dip_below, tiered_by_dip, summarize
+from upcoming_strategies.export import build_fills_frame, build_equity_frame, build_metrics_frame
+from upcoming_strategies.export import render_export_buttons, render_sweep_export_buttons, EXPORT_FORMATS
+from upcoming_strategies.export import run_sweep_export
+from upcoming_strategies.export import params_key
+
+
+def load_prices(ticker, start_date, end_date):
+    """Download prices using the approximate 3 PM price (midpoint of Open and Close)."""
+    return prepare_prices(yf.download(ticker, start=start_date, end=end_date), price="midpoint")
+
+
+DEFAULT_MONTHLY_CAP = 50000
+
+
+def make_params(rules, monthly_cap=DEFAULT_MONTHLY_CAP):
+    """
+    Canonical parameter set for one run: rule amounts and the cap as floats, so the
+    same rules always give the same `params_key` in single-run and sweep exports.
+    """
+    return {
+        "rules": {k: float(v) for k, v in rules.items()},
+        "monthly_cap": float(monthly_cap),
+    }
+
+
+def simulate(df, rules, monthly_cap=DEFAULT_MONTHLY_CAP):
+    """
+    Size each dip greater than 0.5% according to `rules` under a strict monthly cap.
+    Returns the kernel's BacktestResult (fills with 'Investment' / 'Units Bought', daily equity).
+    """
+    tiers = {float(k.replace(">=", "").replace("%", "").strip()): v for k, v in rules.items()}
+    strategy = Strategy("adaptive_dip", dip_below(0.5, inclusive=False), tiered_by_dip(tiers))
+    return backtest(df, [strategy], monthly_cap=monthly_cap)
+
+
+def sweep_runs(tickers, start_date, end_date, param_sets):
+    """
+    Yield (fills, equity, metrics) for every (ticker, parameter set), one run at a time,
+    for streaming export. Each parameter set comes from `make_params`.
+
+    Runs without any buy signal still yield their equity curve and a zero-invested
+    metrics row, and tickers without price data yield a metrics row of NaNs, so the
+    export always has one metrics row per run.
+    """
+    for ticker in tickers:
+        df = load_prices(ticker, start_date, end_date)
+        for params in param_sets:
+            params = make_params(params["rules"], params["monthly_cap"])
+            run_id = f"niftybees_adaptive_dip:{ticker}:{params_key(params)}"
+            if df.empty:
+                yield None, None, build_metrics_frame(run_id, ticker, params=params)
+                continue
+
+            result = simulate(df, params["rules"], params["monthly_cap"])
+            buy_days = result.fills
+            metrics = summarize(result)
+            metrics["XIRR %"] = calculate_xirr_from_result(result)
+
+            yield (
+                build_fills_frame(buy_days, run_id, ticker),
+                build_equity_frame(result.equity, run_id, ticker),
+                build_metrics_frame(run_id, ticker, params=params, **metrics),
+            )
+
 
 def run():
     st.header("📊 NiftyBees Adaptive Dip-Buy Strategy")
@@ -98,83 +163,26 @@ def run():
     # ----------------------------
     # Fetch Data
     # ----------------------------
-    df = yf.download(ticker, start=start_date, end=end_date)
+    df = load_prices(ticker, start_date, end_date)
     if df.empty:
         st.warning("⚠️ No data found for this ticker and date range.")
         return
 
-    df = df.reset_index()
-
-    # ✅ Approximate 3 PM price as the midpoint between Open and Close
-    df["Close"] = (df["Open"] + df["Close"]) / 2
-
-    # Calculate % change using this adjusted price
-    df["Change %"] = df["Close"].pct_change() * 100
-
-    buy_days = df[df["Change %"] < -0.50].copy()  # dips greater than 0.5%
+    params = make_params(rules)
+    result = simulate(df, params["rules"], params["monthly_cap"])
+    buy_days = result.fills
     if buy_days.empty:
         st.warning("No buy signals found in the given period.")
         return
 
-
-    # ----------------------------
-    # ✅ STRICT ₹50,000 MONTHLY CAP LOGIC
-    # ----------------------------
-    sorted_rules = sorted(
-        [(float(k.replace(">=", "").replace("%", "").strip()), v) for k, v in rules.items()],
-        key=lambda x: x[0]
-    )
-
-    monthly_cap = 50000
-    monthly_invested = {}
-    investments = []
-
-    buy_days = buy_days.sort_values("Date").reset_index(drop=True)
-    buy_days["Month"] = buy_days["Date"].dt.to_period("M").astype(str)
-
-    for idx, row in buy_days.iterrows():
-        fall = float(abs(row["Change %"]))
-        date_value = row["Date"]
-        if isinstance(date_value, pd.Series):
-            date_value = date_value.iloc[0]
-        month = pd.to_datetime(date_value).strftime("%Y-%m")
-        already = monthly_invested.get(month, 0)
-
-        base_invest = 0
-        for pct, amt in sorted_rules:
-            if fall >= pct:
-                base_invest = amt
-
-        remaining = monthly_cap - already
-        final_invest = min(base_invest, remaining)
-
-        if remaining <= 0:
-            final_invest = 0
-
-        investments.append(final_invest)
-        monthly_invested[month] = already + final_invest
-
-    buy_days["Investment"] = investments
-
-    inv = buy_days["Investment"]
-    if isinstance(inv, pd.DataFrame):
-        inv = inv.iloc[:, 0]
-
-    close = buy_days["Close"]
-    if isinstance(close, pd.DataFrame):
-        close = close.iloc[:, 0]
-
-    buy_days["Units Bought"] = inv.astype(float) / close.astype(float)
-
     # ----------------------------
     # Portfolio Calculation
     # ----------------------------
-    total_invested = float(buy_days["Investment"].sum())
-    total_units = float(buy_days["Units Bought"].sum())
-    current_price = float(df["Close"].iloc[-1])
-    current_value = float(total_units * current_price)
-    profit = current_value - total_invested
-    profit_percent = (profit / total_invested) * 100 if total_invested > 0 else 0
+    metrics = summarize(result)
+    total_invested = metrics["Total Invested"]
+    current_value = metrics["Current Value"]
+    profit = metrics["Profit"]
+    profit_percent = metrics["Return %"]
 
     # ----------------------------
     # Monthly Summary
@@ -187,15 +195,9 @@ def run():
     # ----------------------------
 
 
-    transactions_df = buy_days[["Date", "Investment"]].copy()
-    # st.write("Transaction DF sample:", transactions_df.head())
-    # st.write("🧾 Debug: Transactions DF")
-    # st.dataframe(transactions_df)
-    #
-    # st.write("💰 Current Value:", current_value)
-    xirr = calculate_xirr_from_data_v2(transactions_df, current_value)
+    xirr = calculate_xirr_from_result(result)
+    metrics["XIRR %"] = xirr
 
-    # xirr = calculate_xirr_from_data_v2(transactions_df)
     st.subheader("💰 Portfolio Summary")
     col1, col2, col3, col4, col5 = st.columns([2, 2, 2, 2, 2])
     col1.metric("Total Invested", f"₹{total_invested:,.0f}")
@@ -219,37 +221,7 @@ def run():
     # ----------------------------
     # Portfolio Growth Over Time
     # ----------------------------
-    portfolio_value = []
-    total_units_so_far = 0
-    total_invested_so_far = 0
-
-    df["Date"] = pd.to_datetime(df["Date"]).dt.normalize()
-    buy_days["Date"] = pd.to_datetime(buy_days["Date"]).dt.normalize()
-    buy_dates = set(buy_days["Date"])
-
-    for i in range(len(df)):
-        date_raw = df.loc[i, "Date"]
-
-        # Handle if it's a Series (e.g., multiple values with same index)
-        if isinstance(date_raw, pd.Series):
-            date_raw = date_raw.iloc[0]
-
-        date_value = pd.to_datetime(date_raw)
-        if isinstance(date_value, pd.Timestamp):
-            date_value = date_value.normalize()
-        if date_value in buy_dates:
-            day_data = buy_days.loc[buy_days["Date"] == date_value]
-            total_units_so_far += float(day_data["Units Bought"].sum())
-            total_invested_so_far += float(day_data["Investment"].sum())
-
-        value = total_units_so_far * float(df.loc[i, "Close"])
-        portfolio_value.append({
-            "Date": date_value,
-            "Portfolio Value": value,
-            "Invested": total_invested_so_far
-        })
-
-    portfolio_df = pd.DataFrame(portfolio_value)
+    portfolio_df = result.equity[["Date", "Portfolio Value", "Invested"]].copy()
 
     plot_adaptive_portfolio_chart(portfolio_df, buy_days)
 
@@ -272,3 +244,38 @@ def run():
         use_container_width=True
     )
 
+    # ----------------------------
+    # Export
+    # ----------------------------
+    run_id = f"niftybees_adaptive_dip:{ticker}:{params_key(params)}"
+    render_export_buttons(
+        build_fills_frame(buy_days, run_id, ticker),
+        build_equity_frame(result.equity, run_id, ticker),
+        build_metrics_frame(run_id, ticker, params=params, **metrics),
+        key="niftybees_adaptive_dip",
+    )
+
+    with st.expander("📦 Sweep export (stocks × parameters)"):
+        sweep_stocks = st.multiselect(
+            "Stocks to include:", list(nifty50_tickers.keys()), default=[selected_stock]
+        )
+        sweep_caps = st.multiselect("Monthly caps (₹):", [25000, 50000, 75000, 100000], default=[50000])
+        sweep_scales = st.multiselect("Rule amount multipliers:", [0.5, 1.0, 1.5, 2.0], default=[1.0])
+        param_sets = [
+            make_params({k: v * scale for k, v in rules.items()}, cap)
+            for cap in sweep_caps
+            for scale in sweep_scales
+        ]
+        st.caption(
+            f"{len(sweep_stocks)} stocks × {len(param_sets)} parameter sets = "
+            f"{len(sweep_stocks) * len(param_sets)} runs"
+        )
+        sweep_format = st.radio("Sweep format:", list(EXPORT_FORMATS), horizontal=True)
+        if st.button("Run sweep & prepare export"):
+            with st.spinner("Running sweep and streaming results..."):
+                run_sweep_export(
+                    sweep_runs([nifty50_tickers[name] for name in sweep_stocks], start_date, end_date, param_sets),
+                    key="niftybees_adaptive_dip",
+                    fmt=sweep_format,
+                )
+        render_sweep_export_buttons(key="niftybees_adaptive_dip")
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+import pytest
+
+from tests.test_kernel import STRATEGIES, make_prices
+from upcoming_strategies.export import (
+    EXPORT_FORMATS, EXPORT_TABLES, METRIC_COLUMNS, TableStreamWriter,
+    build_equity_frame, build_fills_frame, build_metrics_frame, export_runs,
+)
+from upcoming_strategies.kernel import backtest, summarize
+
+
+def small_frame(i, rows=3):
+    return pd.DataFrame({
+        "Run": f"run-{i}",
+        "Date": pd.date_range("2024-01-01", periods=rows),
+        "Investment": np.full(rows, 1000.0 + i),
+    })
+
+
+def test_small_writes_are_buffered_into_full_row_groups(tmp_path):
+    path = tmp_path / "fills.parquet"
+    with TableStreamWriter(str(path), "Parquet", chunk_rows=100) as writer:
+        for i in range(200):
+            writer.write(small_frame(i))
+
+    metadata = pq.ParquetFile(path).metadata
+    assert metadata.num_rows == 600
+    assert metadata.num_row_groups == 6
+    assert [metadata.row_group(i).num_rows for i in range(6)] == [100] * 6
+
+
+def sweep(n_runs=4, empty_first=False):
+    """Yield (fills, equity, metrics) like sweep_runs, on synthetic prices."""
+    for i in range(n_runs):
+        run_id, ticker = f"test:{i}", f"T{i}.NS"
+        if empty_first and i == 0:
+            # A ticker without price data: nothing but a metrics row of NaNs
+            yield None, None, build_metrics_frame(run_id, ticker, params={"i": i})
+            continue
+        result = backtest(make_prices(n=60, seed=i), STRATEGIES, monthly_cap=20000.1)
+        yield (
+            build_fills_frame(result.fills, run_id, ticker),
+            build_equity_frame(result.equity, run_id, ticker),
+            build_metrics_frame(run_id, ticker, params={"i": i}, **summarize(result)),
+        )
+
+
+def read_table(path, fmt):
+    if fmt == "Parquet":
+        return pq.read_table(path)
+    return ipc.open_file(path).read_all()
+
+
+@pytest.mark.parametrize("fmt", list(EXPORT_FORMATS))
+def test_export_runs_round_trip(tmp_path, fmt):
+    expected = list(sweep())
+    paths = export_runs(iter(expected), str(tmp_path), fmt, chunk_rows=50)
+    assert set(paths) == set(EXPORT_TABLES)
+
+    for name, frames in zip(EXPORT_TABLES, zip(*expected)):
+        assert paths[name].endswith(EXPORT_FORMATS[fmt])
+        table = read_table(paths[name], fmt)
+        assert table.num_rows == sum(len(df) for df in frames)
+        assert table.column_names == list(frames[0].columns)
+
+    fills = read_table(paths["fills"], fmt).schema
+    assert fills.field("Date").type == pa.timestamp("ns")
+    assert fills.field("Strategy").type == pa.string()
+    for column in ("Close", "Desired", "Investment", "Units Bought"):
+        assert fills.field(column).type == pa.float64()
+
+    metrics = read_table(paths["metrics"], fmt).to_pandas()
+    assert metrics.columns.tolist() == ["Run", "Ticker", "Params"] + METRIC_COLUMNS
+    assert metrics["Run"].tolist() == [f"test:{i}" for i in range(4)]
+    assert (metrics[METRIC_COLUMNS].dtypes == np.float64).all()
+
+
+@pytest.mark.parametrize("fmt", list(EXPORT_FORMATS))
+def test_empty_first_run_is_followed_by_data(tmp_path, fmt):
+    paths = export_runs(sweep(empty_first=True), str(tmp_path), fmt)
+
+    metrics = read_table(paths["metrics"], fmt).to_pandas()
+    assert len(metrics) == 4
+    assert metrics.loc[0, METRIC_COLUMNS].isna().all()
+    assert metrics.loc[1:, "Total Invested"].notna().all()
+
+    fills = read_table(paths["fills"], fmt).to_pandas()
+    assert "test:0" not in set(fills["Run"])
+    assert fills["Run"].nunique() == 3
+
+
+def test_tables_without_rows_are_omitted(tmp_path):
+    runs = [(None, None, build_metrics_frame("test:0", "T0.NS"))]
+    paths = export_runs(runs, str(tmp_path), "Parquet")
+    assert list(paths) == ["metrics"]
+
+
+def test_later_frames_are_cast_to_the_first_schema(tmp_path):
+    path = tmp_path / "fills.parquet"
+    with TableStreamWriter(str(path), "Parquet") as writer:
+        writer.write(small_frame(0))
+        # Integer amounts and a different column order must still land in the first schema
+        writer.write(pd.DataFrame({
+            "Investment": [5000, 6000],
+            "Date": pd.to_datetime(["2024-02-01", "2024-02-02"]),
+            "Run": "run-1",
+        }))
+
+    table = pq.read_table(path)
+    assert table.column_names == ["Run", "Date", "Investment"]
+    assert table.schema.field("Investment").type == pa.float64()
+    assert table.column("Investment").to_pylist()[-2:] == [5000.0, 6000.0]
+
+
+def test_unsupported_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        TableStreamWriter(str(tmp_path / "x.csv"), "CSV")
+    with pytest.raises(ValueError):
+        export_runs([], str(tmp_path), "CSV")
+
+
+def test_build_metrics_frame_fills_missing_with_nan():
+    metrics = build_metrics_frame("test:0", "T0.NS", params={"b": 2, "a": 1}, **{"Total Invested": 100})
+    assert metrics.columns.tolist() == ["Run", "Ticker", "Params"] + METRIC_COLUMNS
+    assert metrics.loc[0, "Params"] == '{"a":1,"b":2}'
+    assert metrics.loc[0, "Total Invested"] == 100.0
+    assert metrics.loc[0, ["Current Value", "Profit", "Return %", "XIRR %"]].isna().all()
+
+
+def test_build_metrics_frame_rejects_unknown_metrics():
+    with pytest.raises(ValueError, match="Total Investment"):
+        build_metrics_frame("test:0", "T0.NS", **{"Total Investment": 100})
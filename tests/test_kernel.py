@@ -0,0 +1,223 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from upcoming_strategies.kernel import (
+    FILL_COLUMNS, Strategy, backtest, prepare_prices, dip_below, fixed_amount, tiered_by_dip, summarize,
+)
+from upcoming_strategies.moving_average import crossover_signal
+from upcoming_strategies.rsi_strategy import oversold_signal
+
+
+def make_prices(n=300, seed=0, price="close"):
+    """Synthetic yfinance-style download (MultiIndex columns) run through prepare_prices."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2023-01-02", periods=n, freq="B", name="Date")
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    open_ = close * (1 + rng.normal(0, 0.003, n))
+    columns = pd.MultiIndex.from_product([["Open", "Close"], ["TEST.NS"]], names=["Price", "Ticker"])
+    return prepare_prices(pd.DataFrame(np.c_[open_, close], index=index, columns=columns), price=price)
+
+
+def every_nth(n):
+    def signal(prices):
+        return pd.Series(np.arange(len(prices)) % n == 0, index=prices.index)
+    return signal
+
+
+def rolling_below_mean(window):
+    def signal(prices):
+        return prices["Close"] < prices["Close"].rolling(window).mean()
+    return signal
+
+
+STRATEGIES = [
+    Strategy("dip", dip_below(0.5), tiered_by_dip({0.2: 2000.5, 0.5: 5000.3, 1.0: 10000.7})),
+    Strategy("weekly", every_nth(5), fixed_amount(1234.567)),
+    Strategy("mean_reversion", rolling_below_mean(10), fixed_amount(777.7)),
+]
+
+# The plugins shipped with the moving-average and RSI strategies
+PLUGIN_STRATEGIES = [
+    Strategy("ma_crossover", crossover_signal(5, 20), fixed_amount(1000.0)),
+    Strategy("rsi_oversold", oversold_signal(14, 40), fixed_amount(777.7)),
+]
+
+
+def assert_paths_identical(prices, strategies, **kwargs):
+    vectorized = backtest(prices, strategies, mode="vectorized", **kwargs)
+    bar = backtest(prices, strategies, mode="bar", **kwargs)
+    pd.testing.assert_frame_equal(vectorized.fills, bar.fills, check_exact=True)
+    pd.testing.assert_frame_equal(vectorized.equity, bar.equity, check_exact=True)
+    return vectorized
+
+
+@pytest.mark.parametrize("kwargs", [
+    {},
+    {"monthly_cap": 20000.1},
+    {"cash": 150000.3},
+    {"monthly_cap": 20000.1, "cash": 150000.3},
+])
+@pytest.mark.parametrize("price", ["close", "midpoint"])
+def test_vectorized_and_bar_paths_are_identical(kwargs, price):
+    prices = make_prices(price=price)
+    result = assert_paths_identical(prices, STRATEGIES, **kwargs)
+
+    # Several strategies fill on the same bar, in list order
+    per_bar = result.fills.groupby("Date")["Strategy"].agg(list)
+    assert (per_bar.str.len() > 1).any()
+    for names in per_bar:
+        assert names == sorted(names, key=[s.name for s in STRATEGIES].index)
+
+
+def test_monthly_cap_cuts_one_order_and_zeroes_the_rest():
+    result = assert_paths_identical(make_prices(), STRATEGIES, monthly_cap=20000.1)
+    fills = result.fills
+    month = fills["Date"].dt.to_period("M")
+
+    assert (fills.groupby(month)["Investment"].sum() <= 20000.1 + 1e-6).all()
+
+    partial = (fills["Investment"] > 0) & (fills["Investment"] < fills["Desired"])
+    assert partial.any()
+    for i in np.flatnonzero(partial):
+        later = fills[(month == month.iloc[i]) & (fills.index > i)]
+        assert (later["Investment"] == 0).all()
+
+
+def test_cash_limit_caps_total_investment():
+    result = assert_paths_identical(make_prices(), STRATEGIES, cash=150000.3)
+    assert result.fills["Investment"].sum() == pytest.approx(150000.3)
+    assert result.equity["Cash"].iloc[-1] == pytest.approx(0.0)
+    assert (result.equity["Cash"] >= -1e-6).all()
+
+
+def test_non_finite_sizes_are_treated_as_zero():
+    def bad_sizing(prices):
+        sizes = pd.Series(1000.0, index=prices.index)
+        sizes.iloc[::7] = np.nan
+        sizes.iloc[3::11] = np.inf
+        return sizes
+
+    strategies = [Strategy("bad", every_nth(2), bad_sizing)]
+    for kwargs in ({}, {"monthly_cap": 5000}, {"cash": 20000}):
+        result = assert_paths_identical(make_prices(n=120), strategies, **kwargs)
+        assert np.isfinite(result.equity["Portfolio Value"]).all()
+        assert set(result.fills["Desired"]) <= {0.0, 1000.0}
+
+
+def test_summarize_matches_equity():
+    result = backtest(make_prices(), STRATEGIES, monthly_cap=20000.1)
+    metrics = summarize(result)
+    assert metrics["Total Invested"] == pytest.approx(result.equity["Invested"].iloc[-1])
+    assert metrics["Current Value"] == result.equity["Portfolio Value"].iloc[-1]
+    assert metrics["Profit"] == pytest.approx(metrics["Current Value"] - metrics["Total Invested"])
+
+
+def legacy_adaptive_dip(df, rules, monthly_cap):
+    """The per-row loop niftybees_adaptive_dip.run used before the kernel existed."""
+    buy_days = df[df["Change %"] < -0.50].copy()
+    sorted_rules = sorted(
+        [(float(k.replace(">=", "").replace("%", "").strip()), v) for k, v in rules.items()],
+        key=lambda x: x[0]
+    )
+    monthly_invested = {}
+    investments = []
+    buy_days = buy_days.sort_values("Date").reset_index(drop=True)
+    for _, row in buy_days.iterrows():
+        fall = float(abs(row["Change %"]))
+        month = pd.to_datetime(row["Date"]).strftime("%Y-%m")
+        already = monthly_invested.get(month, 0)
+
+        base_invest = 0
+        for pct, amt in sorted_rules:
+            if fall >= pct:
+                base_invest = amt
+
+        remaining = monthly_cap - already
+        final_invest = min(base_invest, remaining)
+        if remaining <= 0:
+            final_invest = 0
+
+        investments.append(final_invest)
+        monthly_invested[month] = already + final_invest
+
+    buy_days["Investment"] = investments
+    buy_days["Units Bought"] = buy_days["Investment"].astype(float) / buy_days["Close"].astype(float)
+    return buy_days
+
+
+@pytest.mark.parametrize("monthly_cap", [50000, 20000])
+def test_matches_legacy_adaptive_dip_loop(monthly_cap):
+    rules = {">= 0.20%": 2000, ">= 0.50%": 5000, ">= 0.70%": 7000, ">= 1.00%": 10000}
+    prices = make_prices(price="midpoint")
+    legacy = legacy_adaptive_dip(prices, rules, monthly_cap)
+
+    tiers = {float(k.replace(">=", "").replace("%", "").strip()): v for k, v in rules.items()}
+    strategy = Strategy("adaptive_dip", dip_below(0.5, inclusive=False), tiered_by_dip(tiers))
+    for mode in ("vectorized", "bar"):
+        fills = backtest(prices, [strategy], monthly_cap=monthly_cap, mode=mode).fills
+        np.testing.assert_array_equal(fills["Date"].to_numpy(), legacy["Date"].to_numpy())
+        np.testing.assert_allclose(fills["Investment"], legacy["Investment"].astype(float))
+        np.testing.assert_allclose(fills["Units Bought"], legacy["Units Bought"])
+
+
+@pytest.mark.parametrize("mode", ["vectorized", "bar"])
+@pytest.mark.parametrize("kwargs", [{}, {"monthly_cap": 20000.1}, {"cash": 150000.3}])
+def test_empty_download_gives_empty_result(mode, kwargs):
+    prices = prepare_prices(pd.DataFrame())
+    assert prices.empty
+    assert pd.api.types.is_datetime64_any_dtype(prices["Date"])
+
+    result = backtest(prices, STRATEGIES, mode=mode, **kwargs)
+    assert result.fills.empty
+    assert result.fills.columns.tolist() == FILL_COLUMNS
+    assert result.equity.empty
+    assert summarize(result)["Total Invested"] == 0.0
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"monthly_cap": 3000.5}, {"cash": 20000.3}])
+@pytest.mark.parametrize("strategies", [
+    PLUGIN_STRATEGIES[:1],
+    PLUGIN_STRATEGIES[1:],
+    PLUGIN_STRATEGIES + STRATEGIES,
+], ids=["ma_crossover", "rsi_oversold", "all"])
+def test_strategy_plugins_match_in_both_paths(strategies, kwargs):
+    result = assert_paths_identical(make_prices(), strategies, **kwargs)
+    for strategy in strategies:
+        assert (result.fills["Strategy"] == strategy.name).any()
+
+
+def test_crossover_ignores_warmup():
+    # Steadily rising prices: the fast MA is already above the slow MA once warm-up ends
+    close = np.linspace(100, 200, 60)
+    prices = pd.DataFrame({
+        "Date": pd.date_range("2024-01-01", periods=60, freq="B"),
+        "Open": close,
+        "Close": close,
+        "Change %": pd.Series(close).pct_change() * 100,
+    })
+    strategy = Strategy("ma_crossover", crossover_signal(5, 20), fixed_amount(1000.0))
+
+    signal = crossover_signal(5, 20)(prices)
+    assert not signal.iloc[19] and not signal.iloc[20]
+    for mode in ("vectorized", "bar"):
+        assert backtest(prices, [strategy], mode=mode).fills.empty
+
+
+def test_crossover_fires_on_a_real_cross():
+    close = np.r_[np.linspace(200, 100, 40), np.linspace(100, 200, 40)]
+    prices = pd.DataFrame({
+        "Date": pd.date_range("2024-01-01", periods=80, freq="B"),
+        "Open": close,
+        "Close": close,
+        "Change %": pd.Series(close).pct_change() * 100,
+    })
+    fast = prices["Close"].rolling(5).mean()
+    slow = prices["Close"].rolling(20).mean()
+
+    fills = assert_paths_identical(
+        prices, [Strategy("ma_crossover", crossover_signal(5, 20), fixed_amount(1000.0))]
+    ).fills
+    assert len(fills) == 1
+    bar = prices.index[prices["Date"] == fills["Date"].iloc[0]][0]
+    assert fast[bar] > slow[bar] and fast[bar - 1] <= slow[bar - 1]
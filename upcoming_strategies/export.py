@@ -0,0 +1,304 @@
+import json
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+import streamlit as st
+
+from upcoming_strategies.kernel import get_column
+
+# -----------------------------
+# Export formats
+# -----------------------------
+EXPORT_FORMATS = {
+    "Parquet": ".parquet",
+    "Arrow IPC": ".arrow",
+}
+
+EXPORT_MIME_TYPES = {
+    "Parquet": "application/vnd.apache.parquet",
+    "Arrow IPC": "application/vnd.apache.arrow.file",
+}
+
+EXPORT_TABLES = ("fills", "equity", "metrics")
+
+# Metrics row schema shared by every strategy: the keys of kernel.summarize() plus XIRR
+METRIC_COLUMNS = ["Total Invested", "Current Value", "Profit", "Return %", "XIRR %"]
+
+# Rows buffered per Parquet row group / Arrow record batch (the last one may be smaller)
+DEFAULT_CHUNK_ROWS = 50_000
+
+
+def _dates(df):
+    """Return the 'Date' column (or DateTimeIndex) as normalized timestamps."""
+    if "Date" in df.columns:
+        dates = pd.to_datetime(get_column(df, "Date"))
+    else:
+        dates = pd.Series(pd.to_datetime(df.index), index=df.index)
+    return dates.dt.normalize().reset_index(drop=True)
+
+
+# -----------------------------
+# Frame builders
+# -----------------------------
+def build_fills_frame(buy_days, run_id, ticker):
+    """
+    Build the fills table for one run.
+
+    Parameters
+    ----------
+    buy_days : pd.DataFrame
+        Kernel fills (`BacktestResult.fills`) with 'Strategy', 'Close', 'Change %', 'Desired',
+        'Investment' and 'Units Bought', and either a 'Date' column or a DateTimeIndex.
+    run_id : str
+        Identifier of the run (used to tell sweep runs apart).
+    ticker : str
+        Yahoo Finance symbol the run was simulated on.
+    """
+    return pd.DataFrame({
+        "Run": run_id,
+        "Ticker": ticker,
+        "Date": _dates(buy_days),
+        "Strategy": get_column(buy_days, "Strategy").astype(str).to_numpy(),
+        "Close": get_column(buy_days, "Close").astype(float).to_numpy(),
+        "Change %": get_column(buy_days, "Change %").astype(float).to_numpy(),
+        "Desired": get_column(buy_days, "Desired").astype(float).to_numpy(),
+        "Investment": get_column(buy_days, "Investment").astype(float).to_numpy(),
+        "Units Bought": get_column(buy_days, "Units Bought").astype(float).to_numpy(),
+    })
+
+
+def build_equity_frame(equity, run_id, ticker):
+    """Tag the kernel's daily equity curve (`BacktestResult.equity`) with the run and ticker."""
+    equity = equity.reset_index(drop=True)
+    equity.insert(0, "Ticker", ticker)
+    equity.insert(0, "Run", run_id)
+    return equity
+
+
+def params_key(params):
+    """Canonical JSON for a run's parameter set, used in run ids and the metrics 'Params' column."""
+    return json.dumps(params or {}, sort_keys=True, separators=(",", ":"))
+
+
+def build_metrics_frame(run_id, ticker, params=None, **metrics):
+    """
+    Build a single-row summary table for one run with the METRIC_COLUMNS schema.
+
+    `params` (the run's parameter set) is stored as canonical JSON in 'Params'.
+    Missing metrics are written as NaN so every strategy's rows can share one file;
+    names outside METRIC_COLUMNS are rejected.
+    """
+    unknown = set(metrics) - set(METRIC_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown metrics: {sorted(unknown)} (expected a subset of {METRIC_COLUMNS})")
+
+    row = {"Run": run_id, "Ticker": ticker, "Params": params_key(params)}
+    for name in METRIC_COLUMNS:
+        value = metrics.get(name)
+        row[name] = float("nan") if value is None else float(value)
+    return pd.DataFrame([row])
+
+
+# -----------------------------
+# Streaming writer
+# -----------------------------
+class TableStreamWriter:
+    """
+    Append DataFrames to a single Parquet or Arrow IPC file, one chunk at a time.
+
+    The schema is taken from the first non-empty frame; later frames are cast to it.
+    Frames are buffered until `chunk_rows` rows have accumulated and then written as one
+    Parquet row group / Arrow record batch, so many small runs don't turn into many tiny
+    row groups. At most about `chunk_rows` rows (plus the frame being added) are held in
+    memory; the remainder is written by `close()`.
+    """
+
+    def __init__(self, sink, fmt="Parquet", chunk_rows=DEFAULT_CHUNK_ROWS):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt!r} (expected one of {list(EXPORT_FORMATS)})")
+        self.sink = sink
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+        self.schema = None
+        self.rows_written = 0
+        self._writer = None
+        self._pending = []
+        self._pending_rows = 0
+
+    def _open(self, schema):
+        self.schema = schema
+        if self.fmt == "Parquet":
+            self._writer = pq.ParquetWriter(self.sink, schema)
+        else:
+            self._writer = ipc.new_file(self.sink, schema)
+
+    def write(self, df):
+        if df is None or df.empty:
+            return
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._open(table.schema)
+        else:
+            table = table.select(self.schema.names).cast(self.schema)
+
+        self._pending.append(table)
+        self._pending_rows += table.num_rows
+        self.rows_written += table.num_rows
+        while self._pending_rows >= self.chunk_rows:
+            self._flush(self.chunk_rows)
+
+    def _flush(self, limit=None):
+        """Write up to `limit` buffered rows (all of them if None) as one row group / batch."""
+        buffered = pa.concat_tables(self._pending)
+        chunk = buffered if limit is None else buffered.slice(0, limit)
+        rest = buffered.slice(chunk.num_rows)
+
+        chunk = chunk.combine_chunks()
+        if self.fmt == "Parquet":
+            self._writer.write_table(chunk, row_group_size=chunk.num_rows)
+        else:
+            for batch in chunk.to_batches():
+                self._writer.write_batch(batch)
+
+        self._pending = [rest] if rest.num_rows else []
+        self._pending_rows = rest.num_rows
+
+    def close(self):
+        if self._writer is not None:
+            if self._pending_rows:
+                self._flush()
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def export_runs(runs, directory, fmt="Parquet", chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Stream fills, equity and metrics for one or more runs into three files.
+
+    Parameters
+    ----------
+    runs : iterable of (fills, equity, metrics)
+        DataFrame triples, typically produced lazily by a generator so that only
+        one run is in memory at a time.
+    directory : str
+        Output directory; created if missing.
+    fmt : str
+        One of EXPORT_FORMATS ("Parquet" or "Arrow IPC").
+
+    Returns
+    -------
+    dict
+        Table name -> written file path. Tables that received no rows are omitted.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt!r} (expected one of {list(EXPORT_FORMATS)})")
+
+    os.makedirs(directory, exist_ok=True)
+    paths = {name: os.path.join(directory, f"{name}{EXPORT_FORMATS[fmt]}") for name in EXPORT_TABLES}
+    writers = {name: TableStreamWriter(paths[name], fmt, chunk_rows) for name in EXPORT_TABLES}
+
+    try:
+        for run in runs:
+            for name, df in zip(EXPORT_TABLES, run):
+                writers[name].write(df)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    return {name: path for name, path in paths.items() if writers[name].rows_written > 0}
+
+
+def frame_to_bytes(df, fmt="Parquet", chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Serialize a single DataFrame to Parquet / Arrow IPC bytes (for st.download_button)."""
+    sink = pa.BufferOutputStream()
+    writer = TableStreamWriter(sink, fmt, chunk_rows)
+    writer.write(df)
+    writer.close()
+    return sink.getvalue().to_pybytes()
+
+
+# -----------------------------
+# Streamlit UI
+# -----------------------------
+def render_export_buttons(fills, equity, metrics, key, fmt=None):
+    """Show a format picker and one download button per table for a single run."""
+    st.subheader("📥 Export")
+    if fmt is None:
+        fmt = st.radio("Export format:", list(EXPORT_FORMATS), horizontal=True, key=f"{key}_export_format")
+
+    ext = EXPORT_FORMATS[fmt]
+    col1, col2, col3 = st.columns(3)
+    for col, name, df in zip((col1, col2, col3), EXPORT_TABLES, (fills, equity, metrics)):
+        with col:
+            st.download_button(
+                f"⬇️ {name.title()} ({fmt})",
+                data=frame_to_bytes(df, fmt),
+                file_name=f"{key}_{name}{ext}",
+                mime=EXPORT_MIME_TYPES[fmt],
+                key=f"{key}_download_{name}",
+                disabled=df.empty,
+            )
+
+
+def _sweep_state_key(key):
+    return f"{key}_sweep_export"
+
+
+def run_sweep_export(runs, key, fmt):
+    """
+    Stream a sweep into a fresh temporary directory and remember the files in st.session_state.
+
+    `runs` should be a generator of (fills, equity, metrics) triples so that the sweep
+    is written run by run instead of being built up in memory first. The files of the
+    previous sweep under the same `key` are deleted.
+    """
+    previous = st.session_state.pop(_sweep_state_key(key), None)
+    if previous is not None:
+        shutil.rmtree(previous["dir"], ignore_errors=True)
+
+    tmp_dir = tempfile.mkdtemp(prefix=f"{key}_sweep_")
+    paths = export_runs(runs, tmp_dir, fmt)
+    st.session_state[_sweep_state_key(key)] = {"dir": tmp_dir, "paths": paths, "fmt": fmt}
+
+
+def render_sweep_export_buttons(key):
+    """
+    Offer the files of the last `run_sweep_export` under `key` for download.
+
+    The buttons are rendered from st.session_state, so they survive the rerun that
+    every st.download_button click triggers. Writing the sweep is streamed, but serving
+    it is not: Streamlit reads each file fully into memory when the button is rendered.
+    """
+    state = st.session_state.get(_sweep_state_key(key))
+    if state is None:
+        return
+
+    paths = {name: path for name, path in state["paths"].items() if os.path.exists(path)}
+    if not paths:
+        st.warning("⚠️ Sweep produced no data to export.")
+        return
+
+    fmt = state["fmt"]
+    ext = EXPORT_FORMATS[fmt]
+    cols = st.columns(len(paths))
+    for col, (name, path) in zip(cols, paths.items()):
+        with col, open(path, "rb") as f:
+            st.download_button(
+                f"⬇️ Sweep {name.title()} ({fmt})",
+                data=f,
+                file_name=f"{key}_sweep_{name}{ext}",
+                mime=EXPORT_MIME_TYPES[fmt],
+                key=f"{key}_sweep_download_{name}",
+            )
@@ -68,6 +68,24 @@ def calculate_xirr_from_data_v2(transactions_df, current_value):
         print("⚠️ XIRR calculation error:", e)
         return 0.0
 
+def calculate_xirr_from_result(result):
+    """
+    XIRR (%) of a kernel BacktestResult.
+
+    Every fill is an outflow on its date and the final portfolio value is an inflow on the
+    last price date (not today), so the value doesn't depend on when it is computed.
+    Returns None when nothing was invested.
+    """
+    fills = result.fills[result.fills["Investment"] > 0]
+    if fills.empty or result.equity.empty:
+        return None
+
+    transactions_df = pd.DataFrame({
+        "Date": list(fills["Date"]) + [result.equity["Date"].iloc[-1]],
+        "CashFlow": list(-fills["Investment"].astype(float)) + [float(result.equity["Portfolio Value"].iloc[-1])],
+    })
+    return calculate_xirr_from_data(transactions_df)
+
 # -----------------------------
 # Portfolio Value Chart
 # -----------------------------
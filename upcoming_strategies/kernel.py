@@ -0,0 +1,325 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Plugin / result containers
+# -----------------------------
+# A strategy plugs into the kernel as two functions of the prepared price frame:
+#   signal(prices) -> boolean Series (True on bars where the strategy wants to buy)
+#   sizing(prices) -> float Series   (amount in ₹ the strategy wants to invest on each bar)
+# Both must be causal (value on a bar may only depend on that bar and earlier ones),
+# which is what lets the vectorized and bar-by-bar paths agree.
+Strategy = namedtuple("Strategy", ["name", "signal", "sizing"])
+
+BacktestResult = namedtuple("BacktestResult", ["fills", "equity"])
+
+FILL_COLUMNS = ["Date", "Strategy", "Close", "Change %", "Desired", "Investment", "Units Bought"]
+
+BACKTEST_MODES = ("vectorized", "bar")
+
+
+def get_column(df, name):
+    """Return a single column as a Series, even when yfinance hands back MultiIndex columns."""
+    col = df[name]
+    if isinstance(col, pd.DataFrame):
+        col = col.iloc[:, 0]
+    return col
+
+
+# -----------------------------
+# Price preparation
+# -----------------------------
+def prepare_prices(data, price="close"):
+    """
+    Flatten a yfinance download into the frame every strategy runs on.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        Output of yf.download (DateTimeIndex, possibly MultiIndex columns).
+    price : str
+        "close" to trade at the close, or "midpoint" to approximate a 3 PM price
+        as the midpoint between Open and Close.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns 'Date', 'Open', 'Close' and 'Change %' with a RangeIndex.
+    """
+    if data.empty:
+        return pd.DataFrame({
+            "Date": pd.Series(dtype="datetime64[ns]"),
+            "Open": pd.Series(dtype=float),
+            "Close": pd.Series(dtype=float),
+            "Change %": pd.Series(dtype=float),
+        })
+
+    data = data.reset_index()
+    open_ = get_column(data, "Open").astype(float).to_numpy()
+    close = get_column(data, "Close").astype(float).to_numpy()
+    if price == "midpoint":
+        close = (open_ + close) / 2
+    elif price != "close":
+        raise ValueError(f"Unsupported price: {price!r} (expected 'close' or 'midpoint')")
+
+    prices = pd.DataFrame({
+        "Date": pd.to_datetime(get_column(data, "Date")).dt.normalize().to_numpy(),
+        "Open": open_,
+        "Close": close,
+    })
+    prices["Change %"] = prices["Close"].pct_change() * 100
+    return prices
+
+
+# -----------------------------
+# Signal / sizing plugins
+# -----------------------------
+def dip_below(threshold_pct, inclusive=True):
+    """Signal on bars that closed `threshold_pct`% or more below the previous bar."""
+    def signal(prices):
+        if inclusive:
+            return prices["Change %"] <= -threshold_pct
+        return prices["Change %"] < -threshold_pct
+    return signal
+
+
+def fixed_amount(amount):
+    """Invest the same amount on every signal."""
+    def sizing(prices):
+        return pd.Series(float(amount), index=prices.index)
+    return sizing
+
+
+def tiered_by_dip(rules):
+    """
+    Invest according to the size of the dip.
+
+    `rules` maps a minimum fall in % to an amount, e.g. {0.5: 5000, 1.0: 10000};
+    the largest threshold not exceeding the fall wins, falls below every threshold invest 0.
+    """
+    sorted_rules = sorted((float(pct), float(amt)) for pct, amt in rules.items())
+    thresholds = np.array([pct for pct, _ in sorted_rules])
+    amounts = np.array([0.0] + [amt for _, amt in sorted_rules])
+
+    def sizing(prices):
+        fall = prices["Change %"].abs().fillna(0.0).to_numpy()
+        tier = np.searchsorted(thresholds, fall, side="right")
+        return pd.Series(amounts[tier], index=prices.index)
+    return sizing
+
+
+# -----------------------------
+# Cap accounting
+# -----------------------------
+def _cap_vectorized(desired, cap, groups=None):
+    """
+    Fill orders in sequence until their running total reaches `cap` (per group, if given).
+
+    The order that crosses the cap is partially filled with what is left and every later
+    order in the group gets nothing. Running totals use plain np.cumsum (pandas' groupby
+    cumsum is Kahan-compensated) so the arithmetic matches `_CapTracker` bit for bit.
+    """
+    desired = np.asarray(desired, dtype=float)
+    running = np.empty_like(desired)
+    prev = np.empty_like(desired)
+    if groups is None:
+        positions = [np.arange(len(desired))]
+    else:
+        positions = pd.Series(np.arange(len(desired))).groupby(groups).indices.values()
+    for pos in positions:
+        running[pos] = np.cumsum(desired[pos])
+        prev[pos] = np.concatenate(([0.0], running[pos][:-1]))
+
+    partial = np.where(prev <= cap, cap - prev, 0.0)
+    return np.where(running <= cap, desired, partial)
+
+
+class _CapTracker:
+    """Bar-by-bar counterpart of `_cap_vectorized`."""
+
+    def __init__(self, cap):
+        self.cap = cap
+        self.running = {}
+
+    def take(self, desired, group=None):
+        prev = self.running.get(group, 0.0)
+        running = prev + desired
+        self.running[group] = running
+        if running <= self.cap:
+            return desired
+        return self.cap - prev if prev <= self.cap else 0.0
+
+
+# -----------------------------
+# Kernel
+# -----------------------------
+def backtest(prices, strategies, monthly_cap=None, cash=None, mode="vectorized"):
+    """
+    Simulate one or more buy-only strategies on a shared calendar and cash pool.
+
+    On every bar, strategies are filled in list order. Desired amounts are first limited
+    by `monthly_cap` (total ₹ per calendar month across all strategies), then by `cash`
+    (total ₹ over the whole backtest). Orders cut to zero by a cap are kept in the fills
+    with 'Investment' 0 so the log shows every signal.
+
+    Parameters
+    ----------
+    prices : pd.DataFrame
+        Output of `prepare_prices`.
+    strategies : list of Strategy
+        Signal / sizing plugins.
+    monthly_cap, cash : float, optional
+        Capital limits; None means unlimited.
+    mode : str
+        "vectorized" (fast path) or "bar" (event-driven, bar-by-bar reference path).
+        Both produce identical fills and equity.
+
+    Returns
+    -------
+    BacktestResult
+        fills : one row per signal, columns FILL_COLUMNS.
+        equity : one row per bar with 'Date', 'Close', 'Total Units', 'Invested',
+                 'Portfolio Value' (and 'Cash' when `cash` is given).
+    """
+    if mode not in BACKTEST_MODES:
+        raise ValueError(f"Unsupported mode: {mode!r} (expected one of {BACKTEST_MODES})")
+
+    prices = prices.reset_index(drop=True)
+    if mode == "vectorized":
+        fills, units, invested = _run_vectorized(prices, strategies, monthly_cap, cash)
+    else:
+        fills, units, invested = _run_bar_by_bar(prices, strategies, monthly_cap, cash)
+
+    close = prices["Close"].to_numpy()
+    equity = pd.DataFrame({
+        "Date": prices["Date"].to_numpy(),
+        "Close": close,
+        "Total Units": units,
+        "Invested": invested,
+        "Portfolio Value": units * close,
+    })
+    if cash is not None:
+        equity["Cash"] = cash - invested
+    return BacktestResult(fills, equity)
+
+
+def _clean_size(size):
+    """Clip sizes to >= 0 and treat NaN / inf as 0, so a bad size can't eat a cap or poison equity."""
+    size = np.asarray(size, dtype=float)
+    return np.maximum(np.nan_to_num(size, nan=0.0, posinf=0.0, neginf=0.0), 0.0)
+
+
+def _fills_frame(prices, bars, names, desired, investment):
+    close = prices["Close"].to_numpy()[bars]
+    return pd.DataFrame({
+        "Date": prices["Date"].to_numpy()[bars],
+        "Strategy": names,
+        "Close": close,
+        "Change %": prices["Change %"].to_numpy()[bars],
+        "Desired": desired,
+        "Investment": investment,
+        "Units Bought": investment / close,
+    }, columns=FILL_COLUMNS)
+
+
+def _run_vectorized(prices, strategies, monthly_cap, cash):
+    orders = []
+    for order, strategy in enumerate(strategies):
+        signal = strategy.signal(prices).fillna(False).to_numpy(dtype=bool)
+        sizing = strategy.sizing(prices).to_numpy(dtype=float)
+        bars = np.flatnonzero(signal)
+        orders.append(pd.DataFrame({
+            "bar": bars,
+            "order": order,
+            "Strategy": strategy.name,
+            "Desired": _clean_size(sizing[bars]),
+        }))
+
+    orders = pd.concat(orders, ignore_index=True) if orders else pd.DataFrame(
+        {"bar": [], "order": [], "Strategy": [], "Desired": []}
+    )
+    orders = orders.sort_values(["bar", "order"], kind="stable").reset_index(drop=True)
+    bars = orders["bar"].to_numpy(dtype=int)
+
+    investment = orders["Desired"].to_numpy(dtype=float)
+    if monthly_cap is not None:
+        months = prices["Date"].dt.to_period("M").to_numpy()[bars]
+        investment = _cap_vectorized(investment, monthly_cap, groups=months)
+    if cash is not None:
+        investment = _cap_vectorized(investment, cash)
+
+    fills = _fills_frame(
+        prices, bars, orders["Strategy"].to_numpy(), orders["Desired"].to_numpy(dtype=float), investment,
+    )
+
+    # Running totals in fill order, carried forward to every bar of the calendar
+    n = len(prices)
+    units = np.zeros(n)
+    invested = np.zeros(n)
+    if len(fills):
+        last_fill = pd.Series(np.arange(len(fills))).groupby(bars).last()
+        units[last_fill.index] = np.cumsum(fills["Units Bought"].to_numpy())[last_fill.to_numpy()]
+        invested[last_fill.index] = np.cumsum(fills["Investment"].to_numpy())[last_fill.to_numpy()]
+        filled = np.zeros(n, dtype=bool)
+        filled[last_fill.index] = True
+        carry = np.maximum.accumulate(np.where(filled, np.arange(n), -1))
+        units = np.where(carry >= 0, units[carry], 0.0)
+        invested = np.where(carry >= 0, invested[carry], 0.0)
+    return fills, units, invested
+
+
+def _run_bar_by_bar(prices, strategies, monthly_cap, cash):
+    month_cap = _CapTracker(monthly_cap) if monthly_cap is not None else None
+    cash_cap = _CapTracker(cash) if cash is not None else None
+
+    bars, names, desired_amounts, investments = [], [], [], []
+    units, invested = np.zeros(len(prices)), np.zeros(len(prices))
+    total_units = total_invested = 0.0
+    close = prices["Close"].to_numpy()
+    months = prices["Date"].dt.to_period("M").to_numpy()
+
+    for i in range(len(prices)):
+        # Strategies only see history up to and including the current bar
+        window = prices.iloc[: i + 1]
+        for strategy in strategies:
+            signal = strategy.signal(window).iloc[-1]
+            if pd.isna(signal) or not bool(signal):
+                continue
+
+            desired = float(_clean_size(strategy.sizing(window).iloc[-1]))
+            amount = desired
+            if month_cap is not None:
+                amount = month_cap.take(amount, months[i])
+            if cash_cap is not None:
+                amount = cash_cap.take(amount)
+
+            bars.append(i)
+            names.append(strategy.name)
+            desired_amounts.append(desired)
+            investments.append(amount)
+            total_units += amount / close[i]
+            total_invested += amount
+
+        units[i] = total_units
+        invested[i] = total_invested
+
+    fills = _fills_frame(
+        prices, np.array(bars, dtype=int), np.array(names, dtype=object),
+        np.array(desired_amounts, dtype=float), np.array(investments, dtype=float),
+    )
+    return fills, units, invested
+
+
+def summarize(result):
+    """Headline metrics of a backtest: total invested, current value, profit and return %."""
+    total_invested = float(result.fills["Investment"].sum())
+    current_value = float(result.equity["Portfolio Value"].iloc[-1]) if len(result.equity) else 0.0
+    profit = current_value - total_invested
+    return {
+        "Total Invested": total_invested,
+        "Current Value": current_value,
+        "Profit": profit,
+        "Return %": (profit / total_invested) * 100 if total_invested > 0 else 0.0,
+    }
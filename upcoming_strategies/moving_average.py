@@ -2,7 +2,53 @@ import streamlit as st
 import yfinance as yf
 import pandas as pd
 import altair as alt
+from upcoming_strategies.kernel import Strategy, backtest, prepare_prices, fixed_amount, summarize
+
+
+def crossover_signal(fast=20, slow=50):
+    """Signal on bars where the fast moving average crosses above the slow one."""
+    def signal(prices):
+        fast_ma = prices["Close"].rolling(fast).mean()
+        slow_ma = prices["Close"].rolling(slow).mean()
+        above = fast_ma > slow_ma
+        # Only count a cross once both averages exist on this bar and the previous one
+        ready = fast_ma.notna() & slow_ma.notna()
+        ready = ready & ready.shift(1, fill_value=False)
+        return ready & above & ~above.shift(1, fill_value=False)
+    return signal
+
 
 def run():
     st.header("📈 Moving average Strategy")
-    st.sidebar.subheader("Strategy Configuration")
\ No newline at end of file
+    st.sidebar.subheader("Strategy Configuration")
+
+    ticker = st.sidebar.text_input("Enter symbol:", "NIFTYBEES.NS")
+    start_date = st.sidebar.date_input("Start Date", pd.to_datetime("2023-01-01"))
+    end_date = st.sidebar.date_input("End Date", pd.Timestamp.today())
+    fast = st.sidebar.number_input("Fast MA (days)", 20, step=5)
+    slow = st.sidebar.number_input("Slow MA (days)", 50, step=5)
+    investment_per_trade = st.sidebar.number_input("Investment per trade (₹)", 5000, step=500)
+
+    prices = prepare_prices(yf.download(ticker, start=start_date, end=end_date))
+    if prices.empty:
+        st.warning("⚠️ No data found for this ticker and date range.")
+        return
+
+    strategy = Strategy("ma_crossover", crossover_signal(fast, slow), fixed_amount(investment_per_trade))
+    result = backtest(prices, [strategy])
+    metrics = summarize(result)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total Invested", f"₹{metrics['Total Invested']:,.0f}")
+    col2.metric("Current Value", f"₹{metrics['Current Value']:,.0f}")
+    col3.metric("Profit / Loss", f"₹{metrics['Profit']:,.0f}")
+    col4.metric("Return %", f"{metrics['Return %']:.2f}%")
+
+    chart = alt.Chart(result.equity).mark_line(color="#4CAF50").encode(
+        x="Date:T",
+        y=alt.Y("Portfolio Value:Q", title="Portfolio Value (₹)"),
+    )
+    st.altair_chart(chart, use_container_width=True)
+
+    st.subheader("Transaction Log")
+    st.dataframe(result.fills[["Date", "Close", "Investment", "Units Bought"]], use_container_width=True)
@@ -2,7 +2,55 @@ import streamlit as st
 import yfinance as yf
 import pandas as pd
 import altair as alt
+from upcoming_strategies.kernel import Strategy, backtest, prepare_prices, fixed_amount, summarize
+
+
+def rsi(close, period=14):
+    """Wilder's RSI (exponential smoothing, so the value on a bar only uses earlier bars)."""
+    delta = close.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    return 100 - 100 / (1 + gain / loss)
+
+
+def oversold_signal(period=14, threshold=30):
+    """Signal on bars where RSI is below `threshold`."""
+    def signal(prices):
+        return rsi(prices["Close"], period) < threshold
+    return signal
+
 
 def run():
     st.header("📈 RSI Strategy")
-    st.sidebar.subheader("Strategy Configuration")
\ No newline at end of file
+    st.sidebar.subheader("Strategy Configuration")
+
+    ticker = st.sidebar.text_input("Enter symbol:", "NIFTYBEES.NS")
+    start_date = st.sidebar.date_input("Start Date", pd.to_datetime("2023-01-01"))
+    end_date = st.sidebar.date_input("End Date", pd.Timestamp.today())
+    period = st.sidebar.number_input("RSI period (days)", 14, step=1)
+    threshold = st.sidebar.number_input("Buy below RSI", 30, step=5)
+    investment_per_trade = st.sidebar.number_input("Investment per trade (₹)", 5000, step=500)
+
+    prices = prepare_prices(yf.download(ticker, start=start_date, end=end_date))
+    if prices.empty:
+        st.warning("⚠️ No data found for this ticker and date range.")
+        return
+
+    strategy = Strategy("rsi_oversold", oversold_signal(period, threshold), fixed_amount(investment_per_trade))
+    result = backtest(prices, [strategy])
+    metrics = summarize(result)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total Invested", f"₹{metrics['Total Invested']:,.0f}")
+    col2.metric("Current Value", f"₹{metrics['Current Value']:,.0f}")
+    col3.metric("Profit / Loss", f"₹{metrics['Profit']:,.0f}")
+    col4.metric("Return %", f"{metrics['Return %']:.2f}%")
+
+    chart = alt.Chart(result.equity).mark_line(color="#4CAF50").encode(
+        x="Date:T",
+        y=alt.Y("Portfolio Value:Q", title="Portfolio Value (₹)"),
+    )
+    st.altair_chart(chart, use_container_width=True)
+
+    st.subheader("Transaction Log")
+    st.dataframe(result.fills[["Date", "Close", "Change %", "Investment", "Units Bought"]], use_container_width=True)